@@ -4,21 +4,30 @@
 
 import os
 import json
-import requests
-import feedparser
+import asyncio
+import concurrent.futures
+import hashlib
+import orjson
 import streamlit as st
 import re
+import threading
+import time
+import urllib.parse
 
 # ---------------------------------------
 # Configuration
 # ---------------------------------------
 st.set_page_config(page_title="AI Travel Buddy !", page_icon="✈️", layout="wide")
 
+@st.cache_resource
+def _load_css(path):
+  # read once per process; a missing file raises and is therefore not cached
+  with open(path, "r", encoding="utf-8") as f:
+    return f.read()
+
 def load_and_inject_css(path="assets/custom.css"):
   try:
-    with open(path, "r", encoding="utf-8") as f:
-      css = f.read()
-      st.markdown(f"<style>{css}</style>", unsafe_allow_html=True)
+    st.markdown(f"<style>{_load_css(path)}</style>", unsafe_allow_html=True)
   except FileNotFoundError:
     st.warning(f"CSS file not found: {path} — continuing without custom styles.")
 
@@ -40,101 +49,229 @@ HEADERS = {
   "Content-Type": "application/json"
 }
 
-def extract_json_array(text: str) -> str:
-  """Return the first top-level JSON array substring from text (handles noisy wrappers)."""
-  if not isinstance(text, str):
-    raise ValueError("extract_json_array expects a string")
-  start = text.find("[")
-  if start == -1:
-    raise ValueError("no '[' found in text")
-  depth = 0
-  for i in range(start, len(text)):
-    c = text[i]
-    if c == "[":
-      depth += 1
-    elif c == "]":
-      depth -= 1
-      if depth == 0:
-        return text[start:i+1]
-  raise ValueError("no matching closing ']' found")
+# Prompts are module constants so every call (and every user) sends a byte-identical
+# prefix, which also lets the provider's prompt cache kick in.
+SYSTEM_TRAVEL = {"role": "system", "content": "You are a concise, reliable travel assistant. Prefer ranges and practical steps."}
+SYSTEM_JSON = {"role": "system", "content": "You are a concise travel assistant. Always return ONLY valid JSON."}
 
-# ---------------------------------------
-# Core API calls (unchanged model)
-# ---------------------------------------
-def get_travel_recommendations(destination, budget, experience_type, month):
-  """
-  Uses the SAME Groq endpoint and model to return structured recs as JSON.
-  """
-  prompt = f"""
+PROMPT_TMPL = """
 Suggest 3-4 unique travel activities for {destination} in {month} with a {budget} budget focused on {experience_type}.
 For each suggestion, return JSON with fields:
 - title (string)
 - desc (string, 2-3 sentences)
 - links (array of 2 URLs: mix of blog and YouTube)
+Respond ONLY with a valid JSON object of the form {{"items": [ ... ]}}.
+"""
+
+EVENTS_PROMPT_TMPL = """
+Return a JSON array with {limit} notable global events / festivals / experiences happening in {month_name}.
+For each item return an object with fields:
+- title (string)
+- date (string)
+- location (string)           
+- description (string)
+- hook (string, one short marketing line)
 Respond ONLY with a valid JSON array.
 """
+
+@st.cache_resource
+def get_client():
+  """
+  One pooled HTTP/2 httpx.Client for all Groq calls, kept across reruns so the
+  connection to api.groq.com is reused (and multiplexed) instead of re-handshaked per call.
+  """
+  import httpx  # deferred: only needed once a Groq call is actually made
+  # pool limits and HTTP/2 must be set on the transport: a Client given transport= ignores its own
+  return httpx.Client(
+    timeout=60.0,
+    headers=HEADERS,
+    transport=httpx.HTTPTransport(
+      http2=True,
+      retries=2,
+      limits=httpx.Limits(max_keepalive_connections=20, max_connections=40)
+    )
+  )
+
+class IncrementalArrayParser:
+  """
+  Stateful scanner for a JSON array that arrives in pieces.
+  feed() text deltas; it returns every object that closed directly inside the
+  top-level array, already parsed. Text before the first '[' is ignored, and
+  elements that fail to parse are skipped.
+  """
+
+  def __init__(self):
+    self.depth = 0          # 0 = array not opened yet, 1 = inside the top-level array
+    self.in_string = False
+    self.escaped = False
+    self.done = False
+    self._parts = []        # characters of the element currently being built
+
+  def feed(self, chunk):
+    out = []
+    for c in chunk:
+      if self.done:
+        break
+      if self.depth == 0:
+        if c == "[":
+          self.depth = 1
+        continue
+      if self.depth >= 2:
+        self._parts.append(c)
+      if self.in_string:
+        if self.escaped:
+          self.escaped = False
+        elif c == "\\":
+          self.escaped = True
+        elif c == '"':
+          self.in_string = False
+      elif c == '"':
+        self.in_string = True
+      elif c in "{[":
+        self.depth += 1
+        if self.depth == 2:
+          self._parts = [c]
+      elif c in "}]":
+        self.depth -= 1
+        if self.depth == 1:
+          try:
+            obj = orjson.loads("".join(self._parts))
+            if isinstance(obj, dict):
+              out.append(obj)
+          except json.JSONDecodeError:
+            pass
+          self._parts = []
+        elif self.depth == 0:
+          self.done = True
+    return out
+
+# ---------------------------------------
+# Core API calls (unchanged model)
+# ---------------------------------------
+# Groq JSON mode needs an object at the root, so the (non-streamed) recommendations are
+# wrapped as {"items": [...]}; the streamed events keep a bare array for IncrementalArrayParser
+JSON_OBJECT_FORMAT = {"type": "json_object"}
+
+def parse_items(text):
+  """Return the "items" list from a JSON-mode answer."""
+  data = orjson.loads(text)
+  items = data.get("items") if isinstance(data, dict) else None
+  if not isinstance(items, list):
+    raise ValueError("expected an object with an 'items' array")
+  return items
+
+@st.cache_data(ttl=3600, show_spinner=False)
+def get_travel_recommendations(destination, budget, experience_type, month):
+  """
+  Uses the SAME Groq endpoint and model to return structured recs as JSON.
+  Cached for an hour per (destination, budget, experience_type, month); failures are not cached.
+  """
+  prompt = PROMPT_TMPL.format(destination=destination, month=month, budget=budget, experience_type=experience_type)
   payload = {
     "model": GROQ_MODEL,  # unchanged
     "messages": [
-      {"role": "system", "content": "You are a travel AI assistant. Always return ONLY valid JSON."},
+      SYSTEM_JSON,
       {"role": "user", "content": prompt}
     ],
-    "temperature": 0.7
+    "temperature": 0.7,
+    # JSON mode: the sampler can only emit valid JSON, so no wrapper text to strip
+    "response_format": JSON_OBJECT_FORMAT
   }
 
-  response = requests.post(GROQ_URL, headers=HEADERS, json=payload)
+  response = get_client().post(GROQ_URL, json=payload)
   response.raise_for_status()
-  # ensure bytes are decoded as UTF-8 (prevents double‑decoded chars like "Ã¢ÂÂ¬")
-  response.encoding = "utf-8"
   # choices is a list; take the first item
-  text = response.json()["choices"][0]["message"]["content"]
-  # Parse JSON robustly (allow noisy wrapper text)
+  text = orjson.loads(response.content)["choices"][0]["message"]["content"]
   try:
-    try:
-      recs = json.loads(text)
-    except json.JSONDecodeError:
-      arr = extract_json_array(text)
-      recs = json.loads(arr)
-    return recs
+    return parse_items(text)
   except Exception as e:
     # store raw assistant output for debugging in the session and raise a friendly error
     st.session_state["last_recs_raw"] = text
     raise ValueError(f"Failed to parse recommendations JSON: {e}. Raw output stored in session_state['last_recs_raw'].")
 
-def fetch_global_events(month_name, limit=4):
-  """
-  Ask the LLM to return a JSON array of global events/festivals/experiences for the given month.
-  Each item must contain: title, date, hook (short one-line sell).
-  Returns list[dict].
-  """
-  prompt = f"""
-Return a JSON array with {limit} notable global events / festivals / experiences happening in {month_name}.
-For each item return an object with fields:
-- title (string)
-- date (string)
-- location (string)           
-- description (string)
-- hook (string, one short marketing line)
-Respond ONLY with a valid JSON array.
-"""
-  messages = [
-    {"role": "system", "content": "You are a concise travel assistant. Always return ONLY valid JSON."},
+def global_events_messages(month_name, limit=4):
+  """Chat messages asking for a JSON array of `limit` global events in `month_name`."""
+  prompt = EVENTS_PROMPT_TMPL.format(limit=limit, month_name=month_name)
+  return [
+    SYSTEM_JSON,
     {"role": "user", "content": prompt}
   ]
-  try:
-    text = send_chat_completion(messages, temperature=0.3)
+
+EVENTS_CACHE_TTL = 3600  # seconds
+EVENTS_CACHE_MAX_ENTRIES = 64
+
+@st.cache_resource
+def _events_cache():
+  """Process-wide ({(month, limit): (fetched_at, events)}, lock) for finished streamed event lists."""
+  return {}, threading.Lock()
+
+def _events_cache_key(month_name, limit):
+  return (month_name.strip().lower(), limit)
+
+def get_cached_events(month_name, limit=4):
+  """Events streamed for this month within the last EVENTS_CACHE_TTL seconds, or None."""
+  cache, lock = _events_cache()
+  with lock:
+    entry = cache.get(_events_cache_key(month_name, limit))
+  if entry and time.monotonic() - entry[0] < EVENTS_CACHE_TTL:
+    return entry[1]
+  return None
+
+def store_cached_events(month_name, events, limit=4):
+  """Remember a complete event list; evicts the oldest entries past EVENTS_CACHE_MAX_ENTRIES."""
+  if not events:
+    return
+  cache, lock = _events_cache()
+  with lock:
+    key = _events_cache_key(month_name, limit)
+    cache.pop(key, None)  # re-insert so the refreshed entry is the newest
+    cache[key] = (time.monotonic(), events)
+    while len(cache) > EVENTS_CACHE_MAX_ENTRIES:
+      cache.pop(next(iter(cache)))
+
+def iter_sse_data(resp):
+  """
+  Yields the `data:` payload (bytes) of each server-sent event in a streaming httpx response.
+  Lines are cut from the raw bytes, so a line split across network chunks is reassembled
+  before use, and an event is only dispatched at its blank-line boundary. Nothing is decoded
+  here; the JSON parser takes the payload bytes directly.
+  """
+  tail = b""       # trailing partial line carried into the next chunk
+  data_lines = []  # data lines of the event in progress; survives across chunks
+  # iter_bytes() without chunk_size hands over each network read as-is: a fixed chunk_size
+  # would hold tokens back until that many bytes had arrived
+  for chunk in resp.iter_bytes():
+    *lines, tail = (tail + chunk).split(b"\n")
+    for line in lines:
+      if line.endswith(b"\r"):
+        line = line[:-1]
+      if not line:
+        if data_lines:
+          yield b"\n".join(data_lines)
+          data_lines = []
+      elif line.startswith(b"data: "):
+        data_lines.append(line[6:])
+      elif line.startswith(b"data:"):
+        data_lines.append(line[5:])
+  tail = tail.rstrip(b"\r")
+  if tail.startswith(b"data:"):
+    data_lines.append(tail[6:] if tail.startswith(b"data: ") else tail[5:])
+  if data_lines:
+    yield b"\n".join(data_lines)
+
+def iter_content_deltas(resp):
+  """Yields choices[0].delta.content strings from a Groq SSE stream until [DONE]."""
+  for data in iter_sse_data(resp):
+    if data == b"[DONE]":
+      break
     try:
-      try:
-        events = json.loads(text)
-      except json.JSONDecodeError:
-        arr = extract_json_array(text)
-        events = json.loads(arr)
-      return events
-    except Exception as e:
-      st.session_state["last_fetch_raw"] = text
-      raise ValueError(f"Failed to parse events JSON: {e}. Raw output stored in session_state['last_fetch_raw'].")
-  except Exception:
-    return []
+      obj = orjson.loads(data)
+      # choices is a list when streaming; use index 0
+      delta = obj["choices"][0]["delta"].get("content")
+      if delta:
+        yield delta
+    except Exception:
+      continue
 
 def groq_chat_stream(messages, temperature=0.5):
   """
@@ -147,64 +284,275 @@ def groq_chat_stream(messages, temperature=0.5):
     "temperature": temperature,
     "stream": True
   }
-  resp = requests.post(GROQ_URL, headers=HEADERS, json=payload, stream=True)
-  resp.raise_for_status()
-  # ensure the SSE stream is decoded as UTF-8
-  resp.encoding = "utf-8"
-
-  for line in resp.iter_lines(decode_unicode=True):
-    if not line:
-      continue
-    if line.startswith("data: "):
-      data = line[len("data: "):]
-      if data == "[DONE]":
-        break
-      try:
-        obj = json.loads(data)
-        # choices is a list when streaming; use index 0
-        delta = obj["choices"][0]["delta"].get("content")
-        if delta:
-          yield delta
-      except Exception:
-        continue
+  with get_client().stream("POST", GROQ_URL, json=payload) as resp:
+    resp.raise_for_status()
+    yield from iter_content_deltas(resp)
   # end groq_chat_stream
 
-def send_chat_completion(messages, temperature=0.5):
+def stream_json_array(messages, temperature=0.3, parser=None):
+  """
+  Streams a JSON-array answer and yields each top-level object as soon as it closes.
+  Pass your own `parser` to check afterwards whether the array closed (parser.done).
+  """
+  parser = parser or IncrementalArrayParser()
+  for delta in groq_chat_stream(messages, temperature=temperature):
+    yield from parser.feed(delta)
+    if parser.done:
+      break
+
+def send_chat_completion(messages, temperature=0.5, client=None):
   """
   Synchronous, non-streaming chat completion. Returns full assistant text.
   Used to immediately send prompts created from buttons (Your Journeys).
+  Pass `client` when calling from a worker thread (st caches need the script thread).
   """
   payload = {
     "model": GROQ_MODEL,
     "messages": messages,
     "temperature": temperature
   }
-  resp = requests.post(GROQ_URL, headers=HEADERS, json=payload)
+  resp = (client or get_client()).post(GROQ_URL, json=payload)
   resp.raise_for_status()
-  resp.encoding = "utf-8"
   # choices is a list; take the first item
-  text = resp.json()["choices"][0]["message"]["content"]
+  text = orjson.loads(resp.content)["choices"][0]["message"]["content"]
   return text.strip()
 
+@st.cache_resource
+def get_executor():
+  """Shared worker pool for background LLM calls, kept across reruns."""
+  return concurrent.futures.ThreadPoolExecutor(max_workers=4, thread_name_prefix="groq")
+
+async def suggest(client, prompt, temperature=0.5):
+  """Async single-prompt completion on a shared httpx.AsyncClient. Returns full assistant text."""
+  payload = {
+    "model": GROQ_MODEL,
+    "messages": [
+      SYSTEM_TRAVEL,
+      {"role": "user", "content": prompt}
+    ],
+    "temperature": temperature
+  }
+  resp = await client.post(GROQ_URL, json=payload)
+  resp.raise_for_status()
+  return orjson.loads(resp.content)["choices"][0]["message"]["content"].strip()
+
+async def _gather_suggestions(prompts, temperature=0.5):
+  import httpx
+  # the async client is bound to the event loop, so it lives only as long as this gather
+  async with httpx.AsyncClient(
+    http2=True,
+    timeout=60.0,
+    headers=HEADERS,
+    limits=httpx.Limits(max_keepalive_connections=20, max_connections=40)
+  ) as client:
+    return await asyncio.gather(*(suggest(client, p, temperature) for p in prompts), return_exceptions=True)
+
+def prefetch_suggestions(prompts, temperature=0.5):
+  """
+  Fire all prompts concurrently and wait for them together.
+  Returns ({prompt: assistant_text}, {prompt: exception}) for the calls that succeeded / failed.
+  """
+  results = asyncio.run(_gather_suggestions(prompts, temperature))
+  replies, failures = {}, {}
+  for p, r in zip(prompts, results):
+    if isinstance(r, BaseException):
+      failures[p] = r
+    else:
+      replies[p] = r
+  return replies, failures
+
+# ---------------------------------------
+# Response cache for chat turns
+# ---------------------------------------
+CHAT_CACHE_MAX_ENTRIES = 256
+
+@st.cache_resource
+def _chat_reply_cache():
+  """Process-wide ({key: reply}, lock) shared across reruns and sessions."""
+  return {}, threading.Lock()
+
+def chat_cache_key(messages, temperature=0.5):
+  """Hashable key for a conversation: (role, content) pairs plus temperature."""
+  return (tuple((m["role"], m["content"]) for m in messages), temperature)
+
+def get_cached_reply(messages, temperature=0.5):
+  """
+  Return a cached assistant reply for these messages, or None on a miss.
+  Tries the exact conversation first, then the same question in other words (normalized_cache_key).
+  """
+  cache, lock = _chat_reply_cache()
+  with lock:
+    reply = cache.get(chat_cache_key(messages, temperature))
+  if reply is None:
+    key = normalized_cache_key(messages, temperature)
+    if key is not None:
+      cache, lock = _normalized_reply_cache()
+      with lock:
+        reply = cache.pop(key, None)
+        if reply is not None:
+          cache[key] = reply  # mark as most recently used
+  return reply
+
+def store_cached_reply(messages, reply, temperature=0.5):
+  """Remember a full assistant reply; evicts the oldest entries past CHAT_CACHE_MAX_ENTRIES."""
+  if not reply:
+    return
+  cache, lock = _chat_reply_cache()
+  with lock:
+    cache[chat_cache_key(messages, temperature)] = reply
+    while len(cache) > CHAT_CACHE_MAX_ENTRIES:
+      cache.pop(next(iter(cache)))
+  key = normalized_cache_key(messages, temperature)
+  if key is not None:
+    cache, lock = _normalized_reply_cache()
+    with lock:
+      cache.pop(key, None)
+      cache[key] = reply
+      while len(cache) > CHAT_CACHE_MAX_ENTRIES:
+        cache.pop(next(iter(cache)))
+
+# Rephrasing-tolerant matching: "3-day Darjeeling plan in September" and
+# "Suggest a 3 day Darjeeling itinerary September" both normalise to
+# (3, day, darjeeling, september) and share one reply. Only identical word
+# sequences match, so "safe"/"not safe" or Bangkok/Hanoi never do.
+_WORD_RE = re.compile(r"[a-z0-9]+")
+_MONTHS = {
+  "jan": "january", "feb": "february", "mar": "march", "apr": "april", "jun": "june",
+  "jul": "july", "aug": "august", "sep": "september", "sept": "september", "oct": "october",
+  "nov": "november", "dec": "december"
+}
+# filler and generic request words that don't change what is being asked
+_STOPWORDS = frozenset("""
+a an and are as at be by can could do for give i in into is it me my of on or our please
+show some suggest tell that the this us we what with would you your plan plans itinerary trip
+""".split())
+
+def normalize_prompt(text):
+  """
+  Content words of `text` in order: lower-cased, stopwords dropped, month abbreviations
+  expanded and a plural "s" stripped.
+  """
+  words = []
+  for w in _WORD_RE.findall(text.lower()):
+    w = _MONTHS.get(w, w)
+    if w in _STOPWORDS:
+      continue
+    if len(w) > 3 and w.endswith("s") and not w.endswith("ss"):
+      w = w[:-1]
+    words.append(w)
+  return tuple(words)
+
+def normalized_cache_key(messages, temperature=0.5):
+  """
+  Key on the latest user message's normalised words; the system prompt and earlier turns must
+  match exactly, so a short follow-up never reuses a reply from another conversation.
+  Returns None when there is nothing to key on.
+  """
+  last = max((i for i, m in enumerate(messages) if m["role"] == "user"), default=None)
+  if last is None:
+    return None
+  words = normalize_prompt(messages[last]["content"])
+  if not words:
+    return None
+  system = tuple(m["content"] for m in messages if m["role"] == "system")
+  earlier = [(m["role"], m["content"]) for m in messages[:last] if m["role"] != "system"]
+  history = hashlib.sha1(orjson.dumps(earlier)).hexdigest()
+  return (system, temperature, history, words)
+
+@st.cache_resource
+def _normalized_reply_cache():
+  """Process-wide ({normalized key: reply}, lock), least recently used first."""
+  return {}, threading.Lock()
+
 # ---------------------------------------
 # Helpers: media and RSS
 # ---------------------------------------
+YOUTUBE_HOSTS = ("youtube.com", "youtu.be")
+
+def is_youtube_link(url):
+  """True when the URL's host is YouTube (a blog URL merely mentioning youtube.com doesn't count)."""
+  host = urllib.parse.urlparse(url).netloc.lower().split(":")[0]
+  return any(host == h or host.endswith("." + h) for h in YOUTUBE_HOSTS)
+
 def render_links(links):
-  yt = [l for l in links if "youtube.com" in l or "youtu.be" in l]
-  blogs = [l for l in links if l not in yt]
+  yt, blogs = [], []
+  for l in links:
+    (yt if is_youtube_link(l) else blogs).append(l)
+  # one markdown element per group: each clickable link on its own bullet
   if yt:
     st.write("Watch")
-    for l in yt:
-      # render each YouTube link as a clickable Markdown link
-      st.markdown(f"- [{l}]({l})")
+    st.markdown("\n".join(f"- [{l}]({l})" for l in yt))
   if blogs:
     st.write("Read")
-    for b in blogs:
-      # render each blog link as a clickable Markdown link
-      st.markdown(f"- [{b}]({b})")
+    st.markdown("\n".join(f"- [{b}]({b})" for b in blogs))
+
+def render_event_card(ev, i):
+  """Two-column card for one global event; `i` keeps the Plan a Trip button key unique."""
+  title = ev.get("title", "Untitled")
+  date = ev.get("date", "")
+  location = ev.get("location", "")  # display location returned by the assistant
+  description = ev.get("description", "")
+  hook = ev.get("hook", "")
+  link = ev.get("link", "")
+
+  # two-column layout: left = headline + hook, right = details + CTA
+  left_col, right_col = st.columns([2, 3])
+  # each column's text is a single markdown element
+  left_md = [f"### {title}"]
+  if location:
+    left_md.append(f"**Location:** {location}")
+  if date:
+    left_md.append(f"**Date:** {date}")
+  if hook:
+    left_md.append(hook)
+  right_md = ["**Details**"]
+  if description:
+    right_md.append(description)
+  if link:
+    right_md.append(f"[Learn more]({link})")
+  with left_col:
+    st.markdown("\n\n".join(left_md))
+  with right_col:
+    st.markdown("\n\n".join(right_md))
+    st.markdown("")  # spacing
+    if st.button("Plan a Trip", key=f"plan_trip_{i}"):
+      # prefill destination
+      if location:
+        st.session_state.setdefault("prefill", {})["destination"] = location
+      # set the URL query param then rerun — it is applied to the sidebar radio before it renders
+      st.query_params["page"] = "Discover"
+      st.rerun()
+  st.divider()
+
+RSS_VALIDATORS_MAX_ENTRIES = 32
 
+@st.cache_resource
+def _rss_validators():
+  """
+  Process-wide ({(feed_url, limit): (etag, modified, items)}, lock) from the last full parse,
+  least recently used first; bounded by RSS_VALIDATORS_MAX_ENTRIES since keys are user-typed URLs.
+  """
+  return {}, threading.Lock()
+
+@st.cache_data(ttl=600, show_spinner=False)
 def fetch_rss_items(feed_url, limit=3):
-  feed = feedparser.parse(feed_url)
+  """
+  Latest `limit` entries of an RSS/Atom feed as plain dicts. Cached for 10 minutes;
+  on expiry the previous ETag/Last-Modified are sent so an unchanged feed answers 304.
+  """
+  import feedparser  # deferred: pulls in sgmllib3k + XML stack, and most sessions never touch RSS
+  validators, lock = _rss_validators()
+  key = (feed_url, limit)
+  with lock:
+    previous = validators.pop(key, None)
+    if previous:
+      validators[key] = previous  # mark as most recently used
+  if previous:
+    feed = feedparser.parse(feed_url, etag=previous[0], modified=previous[1])
+    if feed.get("status") == 304:
+      return previous[2]
+  else:
+    feed = feedparser.parse(feed_url)
   out = []
   for e in feed.entries[:limit]:
     out.append({
@@ -213,6 +561,12 @@ def fetch_rss_items(feed_url, limit=3):
       "summary": getattr(e, "summary", getattr(e, "description", "")),
       "published": getattr(e, "published", "")
     })
+  if feed.get("etag") or feed.get("modified"):
+    with lock:
+      validators.pop(key, None)
+      validators[key] = (feed.get("etag"), feed.get("modified"), out)
+      while len(validators) > RSS_VALIDATORS_MAX_ENTRIES:
+        validators.pop(next(iter(validators)))
   return out
 
 def month_signals(month_name):
@@ -222,6 +576,35 @@ def month_signals(month_name):
     "Use weekday museum entries, city passes, and early timed tickets to cut queues."
   ]
 
+PAGES = ["Discover", "Chatbot", "Your Journeys", "What's Happening"]
+
+CITY_IMAGES = {
+  "manali": "https://images.pexels.com/photos/785419/pexels-photo-785419.jpeg",
+  "goa": "https://images.pexels.com/photos/4428285/pexels-photo-4428285.jpeg",
+  "bali": "https://images.pexels.com/photos/2166559/pexels-photo-2166559.jpeg"
+}
+
+JOURNEY_SUGGESTIONS = [
+  {
+    "label": "Explore Darjeeling",
+    "heading": "From Manali → Darjeeling",
+    "desc": "Crisp hill-station mornings, tea gardens, and scenic toy-train rides — a perfect September escape.",
+    "prompt": "Suggest a 3-day Darjeeling trip this September with top activities and price ranges."
+  },
+  {
+    "label": "Plan Pondicherry",
+    "heading": "From Goa → Pondicherry",
+    "desc": "Laid-back beaches, French-colonial charm, and coastal cafés — a mellow December getaway idea.",
+    "prompt": "Suggest a 3-day Pondicherry plan for December with food highlights and price ranges."
+  },
+  {
+    "label": "Explore Phuket",
+    "heading": "From Bali → Phuket",
+    "desc": "Sunset beaches, island hopping, and lively night markets — a tropical switch for your next summer.",
+    "prompt": "Suggest top beach activities in Phuket this summer with estimated prices."
+  }
+]
+
 # ---------------------------------------
 # Session state
 # ---------------------------------------
@@ -239,17 +622,24 @@ if "navigate_to" in st.session_state:
   st.session_state["page"] = st.session_state.pop("navigate_to")
 
 # --- new: prefer any page set via URL query param (stable across reruns) ---
-qp = st.query_params
-if qp.get("page"):
-  st.session_state["page"] = qp["page"][0]
+# st.query_params values are plain strings. Only apply a value we haven't applied yet,
+# otherwise the URL would override every radio click.
+qp_page = st.query_params.get("page")
+if qp_page in PAGES and qp_page != st.session_state.get("applied_qp_page"):
+  st.session_state["page"] = qp_page
+  st.session_state["applied_qp_page"] = qp_page
 
 # ---------------------------------------
 # Sidebar
 # ---------------------------------------
 with st.sidebar:
   st.header("Navigation")
-  page = st.radio("Go to", ["Discover", "Chatbot", "Your Journeys", "What's Happening"], key="page")
+  page = st.radio("Go to", PAGES, key="page")
   page = st.session_state.get("page", page)
+  # keep the URL in step with the radio so reloads/bookmarks land on the same page
+  if st.query_params.get("page") != page:
+    st.query_params["page"] = page
+  st.session_state["applied_qp_page"] = page
   st.divider()
   st.header("Quick price check")
   st.caption("Use the Chatbot to estimate activity prices. For example: 'Average price for a Seine dinner cruise in December? Include min/median/max.'")
@@ -259,6 +649,143 @@ with st.sidebar:
 # ---------------------------------------
 st.title("✈️ AI Travel Buddy ! ")
 
+# ---------------------------------------
+# Page panels (fragments: widget interactions inside rerun only the panel)
+# ---------------------------------------
+def chat_without_pending():
+  """
+  The chat minus suggestion prompts still waiting for their background reply, so a request
+  never carries another prompt that has no answer yet.
+  """
+  pending = {id(entry["message"]) for entry in st.session_state.get("pending_suggestions", [])}
+  return [m for m in st.session_state.chat if id(m) not in pending]
+
+def _find_message(chat, message):
+  """Index of this exact message dict in the chat (by identity), or None."""
+  for i in range(len(chat) - 1, -1, -1):
+    if chat[i] is message:
+      return i
+  return None
+
+@st.fragment
+def chatbot_panel():
+  # Display prior chat
+  for m in st.session_state.chat:
+    with st.chat_message(m["role"]):
+      st.markdown(m["content"])
+
+  user_msg = st.chat_input("Ask a travel question or price check...")
+  if user_msg:
+    st.session_state.chat.append({"role": "user", "content": user_msg})
+    with st.chat_message("user"):
+      st.markdown(user_msg)
+
+    messages = [SYSTEM_TRAVEL] + chat_without_pending()
+
+    with st.chat_message("assistant"):
+      full_text = get_cached_reply(messages, temperature=0.5)
+      if full_text is not None:
+        # identical conversation answered before: skip the network round-trip
+        st.markdown(full_text)
+      else:
+        full_text = st.write_stream(groq_chat_stream(messages, temperature=0.5))  # returns full concatenated text
+        store_cached_reply(messages, full_text, temperature=0.5)
+
+    st.session_state.chat.append({"role": "assistant", "content": full_text})
+
+@st.fragment
+def rss_panel():
+  st.markdown("Saved articles and videos")
+  feed_url = st.text_input("RSS feed URL (e.g., https://www.intrepidtravel.com/adventures/rss/ )", "")
+  if feed_url:
+    try:
+      items = fetch_rss_items(feed_url, limit=3)
+      for it in items:
+        st.markdown(f"**{it['title']}**")
+        st.write(it["summary"], unsafe_allow_html=True)
+        st.markdown(f"[Open full article]({it['link']})")
+        st.caption(it["published"])
+        st.divider()
+    except Exception as e:
+      st.error(f"RSS error: {e}")
+
+@st.fragment
+def events_panel():
+  month_name = st.text_input("Month", "September")
+
+  st.markdown("_We will send a quick prompt we send to the Chatbot to fetch global highlights for the selected month_")
+
+  if st.button("Fetch global highlights"):
+    events = get_cached_events(month_name, limit=4)
+    if events is not None:
+      # same month fetched within the last hour: no LLM call
+      for i, ev in enumerate(events):
+        render_event_card(ev, i)
+    else:
+      # cards are painted one by one as each event object finishes streaming
+      status = st.empty()
+      status.caption("Fetching global events...")
+      events = []
+      parser = IncrementalArrayParser()
+      try:
+        for ev in stream_json_array(global_events_messages(month_name, limit=4), temperature=0.3, parser=parser):
+          render_event_card(ev, len(events))
+          events.append(ev)
+        # only a closed array is complete; a truncated answer is shown but not cached
+        if parser.done:
+          store_cached_events(month_name, events, limit=4)
+      except Exception:
+        pass
+      status.empty()
+    # keep the results so fragment reruns (e.g. a Plan a Trip click) can redraw them
+    st.session_state["events"] = {"month": month_name, "items": events}
+    if not events:
+      st.info("No events found or the assistant returned malformed JSON. Try another month.")
+  elif st.session_state.get("events", {}).get("month") == month_name and st.session_state["events"]["items"]:
+    for i, ev in enumerate(st.session_state["events"]["items"]):
+      render_event_card(ev, i)
+  else:
+    # show plain inline instruction (not an info/alert block)
+    st.write("Click **Fetch global highlights** to ask the Chatbot for notable events this month.")
+
+@st.fragment(run_every=1)
+def pending_suggestions_panel():
+  """
+  Polls background suggestion calls. Finished replies go into the chat after their prompt; a failed call
+  removes its unanswered user message and leaves an error in suggestion_errors.
+  """
+  pending = st.session_state.get("pending_suggestions", [])
+  if not pending:
+    return
+  still_running = []
+  settled = False
+  for entry in pending:
+    future = entry["future"]
+    if not future.done():
+      still_running.append(entry)
+      continue
+    settled = True
+    chat = st.session_state.chat
+    try:
+      reply = {"role": "assistant", "content": future.result()}
+      # answer goes right after its own prompt, whatever finished or was chatted in between
+      i = _find_message(chat, entry["message"])
+      chat.insert(len(chat) if i is None else i + 1, reply)
+    except Exception as e:
+      # drop the orphaned prompt so the next chat turn doesn't send two user messages in a row
+      i = _find_message(chat, entry["message"])
+      if i is not None:
+        del chat[i]
+      st.session_state.setdefault("suggestion_errors", []).append(
+        f"Assistant error for \"{entry['message']['content']}\": {e}"
+      )
+  st.session_state["pending_suggestions"] = still_running
+  if still_running:
+    st.status(f"Getting assistant suggestion ({len(still_running)} pending)...", state="running")
+  if settled:
+    # full rerun so whichever page is open (e.g. Chatbot) shows the new reply or the error
+    st.rerun()
+
 # ---------------------------------------
 # Pages
 # ---------------------------------------
@@ -284,27 +811,25 @@ if page == "Discover":
      st.write("🔎 Fetching AI recommendations...")
      try:
       recs = get_travel_recommendations(destination, f"{budget} Rs", experience_str, month)
+      # all cards go out as one markdown element (one frontend delta instead of two per card)
+      html_parts = []
       for r in recs:
         title = r.get("title", "")
         desc = r.get("desc", "")
         # Build clickable links HTML (each on its own line)
-        links_html = ""
-        if "links" in r:
-          for l in r["links"]:
-            links_html += f'<div><a href="{l}" target="_blank">{l}</a></div>'
+        links_html = "".join(f'<div><a href="{l}" target="_blank">{l}</a></div>' for l in r.get("links", []))
 
         # Plain "Book Now" link (no boxed button). Append Chatbot prompt text after the suggestion.
-        card_html = f'''
-        <div class="rec-card">
-          <div class="rec-title">{title}</div>
-          <div class="rec-desc">{desc}</div>
-          <div class="rec-links">{links_html}</div>
-          <div style="margin-top:8px;"><a href="https://example.com/booking" target="_blank">📌 Book Now</a></div>
-          <div style="margin-top:8px;color:#444;font-size:13px;">For more questions ask the Chatbot.</div>
-        </div>
-        '''
-        st.markdown(card_html, unsafe_allow_html=True)
-        st.divider()
+        html_parts.append(
+          f'<div class="rec-card">'
+          f'<div class="rec-title">{title}</div>'
+          f'<div class="rec-desc">{desc}</div>'
+          f'<div class="rec-links">{links_html}</div>'
+          f'<div style="margin-top:8px;"><a href="https://example.com/booking" target="_blank">📌 Book Now</a></div>'
+          f'<div style="margin-top:8px;color:#444;font-size:13px;">For more questions ask the Chatbot.</div>'
+          f'</div><hr class="rec-divider"/>'
+        )
+      st.markdown("\n".join(html_parts), unsafe_allow_html=True)
      except Exception as e:
       st.error(f"⚠️ Something went wrong: {e}")
 
@@ -312,52 +837,7 @@ elif page == "Chatbot":
   st.subheader("Hey Arpita ! I am the Travel Chatbot")
   st.caption("Ask for prices, itineraries, neighborhoods, or visa notes. Responses stream live.")
 
-  # Display prior chat
-  for m in st.session_state.chat:
-    with st.chat_message(m["role"]):
-      st.markdown(m["content"])
-
-  user_msg = st.chat_input("Ask a travel question or price check...")
-  if user_msg:
-    st.session_state.chat.append({"role": "user", "content": user_msg})
-    with st.chat_message("user"):
-      st.markdown(user_msg)
-
-    messages = [
-                 {"role": "system", "content": "You are a concise, reliable travel assistant. Prefer ranges and practical steps."}
-               ] + st.session_state.chat
-
-    def stream_gen():
-      payload = {
-        "model": GROQ_MODEL,
-        "messages": messages,
-        "temperature": 0.5,
-        "stream": True
-      }
-      resp = requests.post(GROQ_URL, headers=HEADERS, json=payload, stream=True)
-      resp.raise_for_status()
-      # ensure the SSE stream is decoded as UTF-8
-      resp.encoding = "utf-8"
-      for line in resp.iter_lines(decode_unicode=True):
-        if not line:
-          continue
-        if line.startswith("data: "):
-          data = line[len("data: "):]
-          if data == "[DONE]":
-            break
-          try:
-            obj = json.loads(data)
-            # Streaming delta path: choices[0].delta.content
-            delta = obj["choices"][0]["delta"].get("content")
-            if delta:
-              yield delta
-          except Exception:
-            continue
-
-    with st.chat_message("assistant"):
-      full_text = st.write_stream(stream_gen)  # returns full concatenated text
-
-    st.session_state.chat.append({"role": "assistant", "content": full_text})
+  chatbot_panel()
 
   # Prompt ideas moved here (only visible on Chatbot page)
   with st.expander("Prompt ideas"):
@@ -375,16 +855,8 @@ elif page == "Your Journeys":
   st.markdown("")  # spacing
   cols = st.columns(min(len(prof["visited"]), 3))
   for i, city in enumerate(prof["visited"]):
-    # Use the Pexels images provided (guaranteed themes)
-    q = city.lower()
-    if "manali" in q:
-      img_url = "https://images.pexels.com/photos/785419/pexels-photo-785419.jpeg"
-    elif "goa" in q:
-      img_url = "https://images.pexels.com/photos/4428285/pexels-photo-4428285.jpeg"
-    elif "bali" in q:
-      img_url = "https://images.pexels.com/photos/2166559/pexels-photo-2166559.jpeg"
-    else:
-      img_url = f"https://source.unsplash.com/800x600/?{city.replace(' ', '%20')}"
+    # Use the Pexels images provided (guaranteed themes), else an Unsplash search for the city
+    img_url = CITY_IMAGES.get(city.strip().lower(), f"https://source.unsplash.com/800x600/?{urllib.parse.quote(city)}")
     col = cols[i % len(cols)]
     with col:
       # replace deprecated use_container_width with the new width mapping
@@ -394,112 +866,53 @@ elif page == "Your Journeys":
   st.subheader("Our suggestions — inspired by your journeys")
   st.write("Handpicked next-destination ideas based on your past trips. Tap a suggestion to add a ready-made planning prompt to the Chatbot.")
 
+  # One-shot parallel fetch of all three replies; buttons below serve from it when present
+  if st.button("Pre-fetch all suggestions"):
+    with st.spinner("Pre-fetching assistant suggestions..."):
+      try:
+        replies, failures = prefetch_suggestions([sug["prompt"] for sug in JOURNEY_SUGGESTIONS])
+        st.session_state["prewarmed_suggestions"] = replies
+        if failures:
+          first_error = next(iter(failures.values()))
+          st.error(f"Assistant error: {len(failures)} of {len(JOURNEY_SUGGESTIONS)} suggestions could not be pre-fetched ({first_error}).")
+      except Exception as e:
+        st.error(f"Assistant error: {e}")
+
   # Attractive suggestion cards with CTA buttons
-  s1_col, s2_col, s3_col = st.columns(3)
-  with s1_col:
-    # visual card with light-yellow background (see CSS .suggest-card)
-    st.markdown('<div class="suggest-card"><strong>From Manali → Darjeeling</strong><div class="suggest-desc">Crisp hill-station mornings, tea gardens, and scenic toy-train rides — a perfect September escape.</div></div>', unsafe_allow_html=True)
-    if st.button("Explore Darjeeling"):
-       user_prompt = "Suggest a 3-day Darjeeling trip this September with top activities and price ranges."
-       st.session_state.chat.append({"role": "user", "content": user_prompt})
-       # immediately send to LLM and append assistant reply
-       with st.spinner("Getting assistant suggestion..."):
-         try:
-           messages = [{"role": "system", "content": "You are a concise, reliable travel assistant. Prefer ranges and practical steps."}] + st.session_state.chat
-           assistant_text = send_chat_completion(messages, temperature=0.5)
-           st.session_state.chat.append({"role": "assistant", "content": assistant_text})
-           st.success("Suggestion added and assistant replied (check Chatbot).")
-         except Exception as e:
-           st.error(f"Assistant error: {e}")
-  with s2_col:
-    st.markdown('<div class="suggest-card"><strong>From Goa → Pondicherry</strong><div class="suggest-desc">Laid-back beaches, French-colonial charm, and coastal cafés — a mellow December getaway idea.</div></div>', unsafe_allow_html=True)
-    if st.button("Plan Pondicherry"):
-      user_prompt = "Suggest a 3-day Pondicherry plan for December with food highlights and price ranges."
-      st.session_state.chat.append({"role": "user", "content": user_prompt})
-      with st.spinner("Getting assistant suggestion..."):
-        try:
-          messages = [{"role": "system", "content": "You are a concise, reliable travel assistant. Prefer ranges and practical steps."}] + st.session_state.chat
-          assistant_text = send_chat_completion(messages, temperature=0.5)
-          st.session_state.chat.append({"role": "assistant", "content": assistant_text})
-          st.success("Suggestion added and assistant replied (check Chatbot).")
-        except Exception as e:
-          st.error(f"Assistant error: {e}")
-  with s3_col:
-    st.markdown('<div class="suggest-card"><strong>From Bali → Phuket</strong><div class="suggest-desc">Sunset beaches, island hopping, and lively night markets — a tropical switch for your next summer.</div></div>', unsafe_allow_html=True)
-    if st.button("Explore Phuket"):
-      user_prompt = "Suggest top beach activities in Phuket this summer with estimated prices."
-      st.session_state.chat.append({"role": "user", "content": user_prompt})
-      with st.spinner("Getting assistant suggestion..."):
-        try:
-          messages = [{"role": "system", "content": "You are a concise, reliable travel assistant. Prefer ranges and practical steps."}] + st.session_state.chat
-          assistant_text = send_chat_completion(messages, temperature=0.5)
-          st.session_state.chat.append({"role": "assistant", "content": assistant_text})
+  for col, sug in zip(st.columns(len(JOURNEY_SUGGESTIONS)), JOURNEY_SUGGESTIONS):
+    with col:
+      # visual card with light-yellow background (see CSS .suggest-card)
+      st.markdown(f'<div class="suggest-card"><strong>{sug["heading"]}</strong><div class="suggest-desc">{sug["desc"]}</div></div>', unsafe_allow_html=True)
+      if st.button(sug["label"]):
+        user_prompt = sug["prompt"]
+        user_message = {"role": "user", "content": user_prompt}
+        st.session_state.chat.append(user_message)
+        prewarmed = st.session_state.get("prewarmed_suggestions", {})
+        if user_prompt in prewarmed:
+          st.session_state.chat.append({"role": "assistant", "content": prewarmed[user_prompt]})
           st.success("Suggestion added and assistant replied (check Chatbot).")
-        except Exception as e:
-          st.error(f"Assistant error: {e}")
+        else:
+          # send to the LLM in the background; pending_suggestions_panel appends the reply when it lands
+          messages = [SYSTEM_TRAVEL] + chat_without_pending()
+          future = get_executor().submit(send_chat_completion, messages, 0.5, get_client())
+          # keep the user message with the future so a failed call can take it back out of the chat
+          st.session_state.setdefault("pending_suggestions", []).append({"future": future, "message": user_message})
+          st.info("Suggestion added — the assistant is replying in the background (check Chatbot).")
 
   st.divider()
-  st.markdown("Saved articles and videos")
-  feed_url = st.text_input("RSS feed URL (e.g., https://www.intrepidtravel.com/adventures/rss/ )", "")
-  if feed_url:
-    try:
-      items = fetch_rss_items(feed_url, limit=3)
-      for it in items:
-        st.markdown(f"**{it['title']}**")
-        st.write(it["summary"], unsafe_allow_html=True)
-        st.markdown(f"[Open full article]({it['link']})")
-        st.caption(it["published"])
-        st.divider()
-    except Exception as e:
-      st.error(f"RSS error: {e}")
+  rss_panel()
 
 elif page == "What's Happening":
   st.subheader("What’s happening around the world")
   st.caption("Discover festivals, events and experiences worth travelling for.")
-  month_name = st.text_input("Month", "September")
+  events_panel()
 
-  st.markdown("_We will send a quick prompt we send to the Chatbot to fetch global highlights for the selected month_")
+# last, so a suggestion submitted during this run is already being polled
+if st.session_state.get("pending_suggestions"):
+  with st.sidebar:
+    pending_suggestions_panel()
 
-  if st.button("Fetch global highlights"):
-    with st.spinner("Fetching global events..."):
-      events = fetch_global_events(month_name, limit=4)
-    if not events:
-      st.info("No events found or the assistant returned malformed JSON. Try another month.")
-    else:
-      for i, ev in enumerate(events):
-        title = ev.get("title", "Untitled")
-        date = ev.get("date", "")
-        location = ev.get("location", "")  # display location returned by the assistant
-        description = ev.get("description", "")
-        hook = ev.get("hook", "")
-        link = ev.get("link", "")
-
-        # two-column layout: left = headline + hook, right = details + CTA
-        left_col, right_col = st.columns([2, 3])
-        with left_col:
-          st.markdown(f"### {title}")
-          if location:
-            st.markdown(f"**Location:** {location}")
-          if date:
-            st.markdown(f"**Date:** {date}")
-          if hook:
-            st.write(hook)
-        with right_col:
-          st.markdown("**Details**")
-          if description:
-            st.write(description)
-          if link:
-            st.markdown(f"[Learn more]({link})")
-          st.markdown("")  # spacing
-          if st.button("Plan a Trip", key=f"plan_trip_{i}"):
-            # prefill destination
-            if location:
-              st.session_state.setdefault("prefill", {})["destination"] = location
-            # set a URL query param (and session) then rerun — this reliably updates the sidebar radio
-            st.session_state["page"] = "Discover"
-            st.experimental_set_query_params(page="Discover")
-            st.experimental_rerun()
-        st.divider()
-  else:
-    # show plain inline instruction (not an info/alert block)
-    st.write("Click **Fetch global highlights** to ask the Chatbot for notable events this month.")
+# rendered by the full run (not the polling fragment), so they stay up until the next full rerun
+for err in st.session_state.pop("suggestion_errors", []):
+  with st.sidebar:
+    st.error(err)